@@ -1,11 +1,17 @@
+from contextlib import contextmanager
+import logging
 from dataclasses import dataclass
 from typing import Optional
+import queue
 import serial
 import serial.tools.list_ports
 import socket
+import struct
 import threading
 import time
 
+logger = logging.getLogger(__name__)
+
 @dataclass
 class ModbusSettings:
     port: str
@@ -17,133 +23,263 @@ class ModbusSettings:
     connection_type: str = 'serial'
     ip_address: Optional[str] = None
     tcp_port: Optional[int] = None
+    tcp_pool_size: int = 4
+
+# Port enumeration walks sysfs/udev (or the Windows registry) on every
+# call, so the result is cached briefly; the UI polls /ports far more
+# often than ports appear or disappear.
+_PORTS_CACHE_TTL = 5.0  # seconds
+_ports_cache = None
+_ports_cache_time = 0.0
+
+# One shared watchdog thread scans every registered connection instead of
+# each connect() spawning its own polling thread.
+_WATCHDOG_INTERVAL = 1.0  # seconds between health scans
+
+_watchdog_lock = threading.Lock()
+_watched_managers = set()
+_watchdog_thread = None
+
+def _watchdog_loop():
+    while True:
+        time.sleep(_WATCHDOG_INTERVAL)
+        with _watchdog_lock:
+            managers = list(_watched_managers)
+        for manager in managers:
+            manager._check_health()
+
+def _watch(manager):
+    global _watchdog_thread
+    with _watchdog_lock:
+        _watched_managers.add(manager)
+        if _watchdog_thread is None:
+            _watchdog_thread = threading.Thread(target=_watchdog_loop, daemon=True)
+            _watchdog_thread.start()
+
+def _unwatch(manager):
+    with _watchdog_lock:
+        _watched_managers.discard(manager)
 
 class ConnectionManager:
     def __init__(self):
         self.serial = None
-        self.tcp_socket = None
+        self._tcp_pool = None
+        self._tcp_settings = None  # (ip_address, tcp_port, timeout_seconds)
         self._is_connected = False
         self._lock = threading.Lock()
-        self._watchdog_thread = None
-        self._stop_watchdog = threading.Event()
+        # Reusable receive buffer; transactions are serialized by the
+        # handler, so one buffer per manager is safe
+        self._rx_buf = bytearray(1024)
+        self._rx_mv = memoryview(self._rx_buf)
 
     def get_available_ports(self) -> list[str]:
+        global _ports_cache, _ports_cache_time
+        now = time.monotonic()
+        if _ports_cache is not None and now - _ports_cache_time < _PORTS_CACHE_TTL:
+            return _ports_cache
+
         try:
             ports = []
             for port in serial.tools.list_ports.comports():
                 ports.append(port.device)
-            print(f"Found available ports: {ports}")
+            logger.debug(f"Found available ports: {ports}")
+            _ports_cache = ports
+            _ports_cache_time = now
             return ports
         except Exception as e:
-            print(f"Error getting available ports: {str(e)}")
+            logger.error(f"Error getting available ports: {str(e)}")
             raise Exception(f"Failed to get available ports: {str(e)}")
 
-    def _start_watchdog(self, timeout_microseconds: float):
-        def watchdog():
-            while not self._stop_watchdog.is_set():
-                if not self._is_connected:
-                    break
-                time.sleep(timeout_microseconds / 2000000)  # Half the timeout in seconds
+    def _check_health(self) -> None:
+        """Called by the shared watchdog thread; drops dead serial ports."""
+        if self._is_connected and self.serial and not self.serial.is_open:
+            logger.warning("Watchdog: Serial port closed unexpectedly")
+            self.disconnect()
+
+    def connect(self, settings: ModbusSettings) -> bool:
+        try:
+            self.disconnect()  # Always disconnect first
+
+            # Convert microseconds to seconds for serial/socket timeout
+            timeout_seconds = settings.timeout / 1_000_000
+
+            # Build the new resources first, then install them under a
+            # short-held lock; I/O never happens while holding _lock
+            if settings.connection_type == 'tcp':
+                tcp_pool = queue.LifoQueue(maxsize=settings.tcp_pool_size)
                 with self._lock:
-                    if self.serial and not self.serial.is_open:
-                        print("Watchdog: Serial port closed unexpectedly")
-                        self.disconnect()
-                        break
+                    self._tcp_settings = (settings.ip_address, settings.tcp_port, timeout_seconds)
+                    self._tcp_pool = tcp_pool
+                # Open one socket eagerly so connection errors surface here
+                tcp_pool.put(self._new_tcp_socket())
+            else:
+                # Modbus RTU marks end-of-frame with a 3.5-character idle
+                # gap; letting the driver detect it returns short frames
+                # (e.g. exception responses) without waiting out the timeout
+                inter_byte_gap = (3.5 * 11 / settings.baudrate) if settings.baudrate else None
 
-        self._watchdog_thread = threading.Thread(target=watchdog)
-        self._watchdog_thread.daemon = True
-        self._watchdog_thread.start()
+                new_serial = serial.Serial(
+                    port=settings.port,
+                    baudrate=settings.baudrate,
+                    parity=settings.parity,
+                    stopbits=settings.stopbits,
+                    bytesize=settings.bytesize,
+                    timeout=timeout_seconds,  # pyserial uses seconds
+                    inter_byte_timeout=inter_byte_gap
+                )
+                with self._lock:
+                    self.serial = new_serial
 
-    def connect(self, settings: ModbusSettings) -> bool:
+            self._is_connected = True
+            _watch(self)
+            logger.info(f"Successfully connected to {settings.port if settings.port else settings.ip_address}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Connection error: {str(e)}")
+            self.disconnect()  # Roll back any partially installed state
+            return False
+
+    def disconnect(self) -> None:
+        _unwatch(self)
+
+        # Swap the references out under the lock, close outside it
         with self._lock:
+            ser, self.serial = self.serial, None
+            pool, self._tcp_pool = self._tcp_pool, None
+            self._tcp_settings = None
+            self._is_connected = False
+
+        if ser:
             try:
-                self.disconnect()  # Always disconnect first
-                
-                # Convert microseconds to seconds for serial/socket timeout
-                timeout_seconds = settings.timeout / 1_000_000
-                
-                if settings.connection_type == 'tcp':
-                    self.tcp_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                    self.tcp_socket.settimeout(timeout_seconds)
-                    self.tcp_socket.connect((settings.ip_address, settings.tcp_port))
-                else:
-                    self.serial = serial.Serial(
-                        port=settings.port,
-                        baudrate=settings.baudrate,
-                        parity=settings.parity,
-                        stopbits=settings.stopbits,
-                        bytesize=settings.bytesize,
-                        timeout=timeout_seconds  # pyserial uses seconds
-                    )
-                
-                self._is_connected = True
-                self._stop_watchdog.clear()
-                self._start_watchdog(settings.timeout)
-                print(f"Successfully connected to {settings.port if settings.port else settings.ip_address}")
-                return True
-                
+                if ser.is_open:
+                    ser.close()
             except Exception as e:
-                print(f"Connection error: {str(e)}")
-                self._is_connected = False
-                return False
+                logger.error(f"Error closing serial port: {str(e)}")
 
-    def disconnect(self) -> None:
-        with self._lock:
-            self._stop_watchdog.set()
-            if self._watchdog_thread:
-                self._watchdog_thread.join(timeout=1.0)
-            
-            if self.serial:
-                try:
-                    if self.serial.is_open:
-                        self.serial.close()
-                except Exception as e:
-                    print(f"Error closing serial port: {str(e)}")
-                finally:
-                    self.serial = None
-                    
-            if self.tcp_socket:
+        if pool:
+            while not pool.empty():
                 try:
-                    self.tcp_socket.close()
+                    pool.get_nowait().close()
                 except Exception as e:
-                    print(f"Error closing TCP socket: {str(e)}")
-                finally:
-                    self.tcp_socket = None
-                    
-            self._is_connected = False
-            print("Connection closed and resources released")
+                    logger.error(f"Error closing TCP socket: {str(e)}")
+
+        logger.info("Connection closed and resources released")
 
     def is_connected(self) -> bool:
-        with self._lock:
-            if self.serial:
-                self._is_connected = self.serial.is_open
-            elif self.tcp_socket:
-                self._is_connected = True  # TCP connection status is checked on send/receive
-            return self._is_connected
+        # Plain attribute reads are atomic under the GIL, so status checks
+        # no longer queue up behind an in-flight transaction
+        ser = self.serial
+        if ser:
+            self._is_connected = ser.is_open
+        elif self._tcp_pool is not None:
+            self._is_connected = True  # TCP connection status is checked on send/receive
+        return self._is_connected
 
-    def send_and_receive(self, data: bytearray) -> Optional[bytearray]:
-        with self._lock:
-            if not self.is_connected():
-                return None
-                
+    def _new_tcp_socket(self) -> socket.socket:
+        """Create a connected keep-alive socket from the stored settings."""
+        ip_address, tcp_port, timeout_seconds = self._tcp_settings
+        # create_connection resolves IPv4/IPv6 in one step and applies the
+        # timeout to the handshake as well
+        sock = socket.create_connection((ip_address, tcp_port), timeout=timeout_seconds)
+        # Disable Nagle: Modbus PDUs are tiny and latency-sensitive
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        if hasattr(socket, 'TCP_QUICKACK'):  # Linux only
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+        # Close with RST instead of FIN so rapid reconnects don't pile up
+        # sockets in TIME_WAIT; safe for request/response Modbus because a
+        # transaction is complete before we ever close
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+        return sock
+
+    @contextmanager
+    def _checkout_tcp_socket(self, pool: queue.LifoQueue):
+        """Check a socket out of the pool, creating one if the pool is empty.
+
+        Healthy sockets go back to the pool; a socket that raised is closed
+        and discarded so the pool refills lazily with fresh connections.
+        """
+        try:
+            sock = pool.get_nowait()
+        except queue.Empty:
+            sock = self._new_tcp_socket()
+        try:
+            yield sock
+        except Exception:
             try:
-                if self.tcp_socket:
-                    self.tcp_socket.send(data)
-                    response = self.tcp_socket.recv(1024)
-                else:
-                    self.serial.write(data)
-                    response = self.serial.read(256)
-                
-                if not response:
-                    print("No response received within timeout period")
-                    return None
-                    
-                return bytearray(response)
-                
-            except Exception as e:
-                print(f"Communication error: {str(e)}")
-                self._is_connected = False
+                sock.close()
+            except Exception:
+                pass
+            raise
+        else:
+            try:
+                pool.put_nowait(sock)
+            except queue.Full:
+                sock.close()
+
+    def _transact(self, data: bytearray, expected_length: int = 256) -> Optional[bytes]:
+        """Perform one request/response exchange on the current connection.
+
+        expected_length lets the serial read return as soon as the whole
+        response frame has arrived instead of waiting out the timeout.
+        """
+        # Snapshot the references so a concurrent disconnect() cannot swap
+        # them out mid-transaction; a closed fd surfaces as an error below
+        pool = self._tcp_pool
+        ser = self.serial
+        try:
+            if pool is not None:
+                with self._checkout_tcp_socket(pool) as sock:
+                    # sendall pushes the whole frame in one call instead of
+                    # relying on send() accepting it in a single attempt
+                    sock.sendall(data)
+                    # 260 bytes is the maximum Modbus/TCP ADU
+                    received = sock.recv_into(self._rx_mv, 260)
+            else:
+                ser.write(data)
+                received = ser.readinto(self._rx_mv[:min(expected_length, 256)]) or 0
+
+            if not received:
+                logger.debug("No response received within timeout period")
                 return None
 
+            return bytes(self._rx_mv[:received])
+
+        except Exception as e:
+            logger.error(f"Communication error: {str(e)}")
+            self._is_connected = False
+            return None
+
+    def send_and_receive(self, data: bytearray, expected_length: int = 256) -> Optional[bytes]:
+        # Plain flag check: is_connected() re-reads serial.is_open, which
+        # can cost an ioctl, and the except path in _transact already flips
+        # the flag on a real disconnect
+        if not self._is_connected:
+            return None
+        return self._transact(data, expected_length)
+
+    def send_and_receive_batch(self, frames: list[bytearray],
+                               expected_lengths: Optional[list[int]] = None) -> list[Optional[bytes]]:
+        """Exchange a whole batch of frames in one pass.
+
+        The bus is half-duplex, so frames are still sent one at a time, but
+        batching amortizes the connection checks over the cycle and stops
+        early once the connection drops.
+        """
+        if not self._is_connected:
+            return [None] * len(frames)
+
+        if expected_lengths is None:
+            expected_lengths = [256] * len(frames)
+
+        responses = []
+        for frame, expected_length in zip(frames, expected_lengths):
+            if not self._is_connected:
+                responses.append(None)
+                continue
+            responses.append(self._transact(frame, expected_length))
+        return responses
+
     def __del__(self):
         self.disconnect()
@@ -1,12 +1,32 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Union, Dict
+import logging
+import logging.handlers
+import queue
 import uvicorn
 from modbus_handler import ModbusHandler, ModbusSettings, ModbusRequest
-import threading
 
-app = FastAPI()
+# Records are queued and formatted/written on a background thread so the
+# hot polling path never blocks on a stderr write
+_log_queue = queue.Queue(-1)
+_root_logger = logging.getLogger()
+_root_logger.setLevel(logging.INFO)
+_root_logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+
+logger = logging.getLogger(__name__)
+
+# orjson serializes /polling-status and /request responses in C; fall back
+# to the default JSON response when it is not installed
+try:
+    import orjson  # noqa: F401 — used by ORJSONResponse
+    from fastapi.responses import ORJSONResponse
+    app = FastAPI(default_response_class=ORJSONResponse)
+except ImportError:
+    app = FastAPI()
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,7 +37,6 @@ app.add_middleware(
 )
 
 modbus_handler = ModbusHandler()
-polling_thread = None
 polling_status = {
     "is_polling": False,
     "stats": {},
@@ -25,67 +44,66 @@ polling_status = {
     "started_requests": 0
 }
 
+# Fields are snake_case to match the dataclasses they feed; the frontend's
+# camelCase payloads come in through aliases
 class ConnectionSettings(BaseModel):
-    connectionType: str = 'serial'
+    model_config = ConfigDict(extra='ignore', populate_by_name=True)
+
+    connection_type: str = Field('serial', alias='connectionType')
     port: Optional[str] = None
-    baudRate: Optional[int] = None
+    baudrate: Optional[int] = Field(None, alias='baudRate')
     parity: Optional[str] = None
-    stopBits: Optional[float] = None
-    dataBits: Optional[int] = None
+    stopbits: Optional[float] = Field(None, alias='stopBits')
+    bytesize: Optional[int] = Field(None, alias='dataBits')
     timeout: float  # Now in microseconds
-    ipAddress: Optional[str] = None
-    tcpPort: Optional[int] = None
+    ip_address: Optional[str] = Field(None, alias='ipAddress')
+    tcp_port: Optional[int] = Field(None, alias='tcpPort')
 
 class ModbusRequestModel(BaseModel):
+    model_config = ConfigDict(extra='ignore', populate_by_name=True)
+
     name: str
     function: int
-    startAddress: int
+    start_address: int = Field(alias='startAddress')
     count: int
-    slaveId: Optional[int] = 1
+    slave_id: Optional[int] = Field(1, alias='slaveId')
     data: Optional[List[int]] = None
     comment: Optional[str] = None
     order: Optional[int] = 0
     cycles: Optional[int] = None
 
 class PollingSettings(BaseModel):
+    model_config = ConfigDict(extra='ignore')
+
     requests: List[ModbusRequestModel]
     interval: float
     cycles: Optional[int] = None
 
 @app.get("/ports")
-async def get_ports():
+def get_ports():
     try:
-        print("Getting available ports...")  # Debug log
+        logger.debug("Getting available ports...")
         ports = modbus_handler.get_available_ports()
-        print(f"Retrieved ports: {ports}")  # Debug log
+        logger.debug(f"Retrieved ports: {ports}")
         return {"ports": ports}
     except Exception as e:
-        print(f"Error in get_ports endpoint: {str(e)}")  # Debug log
+        logger.error(f"Error in get_ports endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/connect")
-async def connect(settings: ConnectionSettings):
+def connect(settings: ConnectionSettings):
     try:
-        print(f"Received connection settings: {settings}")
-        modbus_settings = ModbusSettings(
-            port=settings.port,
-            baudrate=settings.baudRate,
-            parity=settings.parity,
-            stopbits=settings.stopBits,
-            bytesize=settings.dataBits,
-            timeout=settings.timeout,  # Already in microseconds from frontend
-            connection_type=settings.connectionType,
-            ip_address=settings.ipAddress,
-            tcp_port=settings.tcpPort
-        )
+        logger.info(f"Received connection settings: {settings}")
+        # Field names mirror the dataclass, so the model dumps straight in
+        modbus_settings = ModbusSettings(**settings.model_dump())
         success = modbus_handler.connect(modbus_settings)
         return {"success": success}
     except Exception as e:
-        print(f"Connection error: {str(e)}")
+        logger.error(f"Connection error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/disconnect")
-async def disconnect():
+def disconnect():
     try:
         modbus_handler.disconnect()
         return {"success": True}
@@ -93,19 +111,9 @@ async def disconnect():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/request")
-async def send_request(request: ModbusRequestModel):
+def send_request(request: ModbusRequestModel):
     try:
-        modbus_request = ModbusRequest(
-            name=request.name,
-            function=request.function,
-            start_address=request.startAddress,
-            count=request.count,
-            slave_id=request.slaveId,
-            data=request.data,
-            comment=request.comment,
-            order=request.order,
-            cycles=request.cycles
-        )
+        modbus_request = ModbusRequest(**request.model_dump())
         response = modbus_handler.send_request(modbus_request)
         return response
     except Exception as e:
@@ -129,48 +137,30 @@ async def get_polling_status():
     return polling_status
 
 @app.post("/start-polling")
-async def start_polling(settings: PollingSettings):
-    global polling_thread, polling_status
+def start_polling(settings: PollingSettings):
+    global polling_status
     try:
-        if polling_thread and polling_thread.is_alive():
-            modbus_handler.stop_polling()
-            polling_thread.join()
-
         requests = [
-            ModbusRequest(
-                name=req.name,
-                function=req.function,
-                start_address=req.startAddress,
-                count=req.count,
-                slave_id=req.slaveId,
-                data=req.data,
-                comment=req.comment,
-                order=req.order,
-                cycles=req.cycles
-            ) for req in settings.requests
+            ModbusRequest(**req.model_dump()) for req in settings.requests
         ]
 
         polling_status["is_polling"] = True
         polling_status["selected_requests"] = [req.name for req in settings.requests]
         polling_status["stats"] = {}
 
-        polling_thread = threading.Thread(
-            target=modbus_handler.start_polling,
-            args=(requests, settings.interval, settings.cycles)
-        )
-        polling_thread.start()
+        # start_polling stops any previous cycle, spawns its own worker
+        # thread and returns promptly
+        modbus_handler.start_polling(requests, settings.interval, settings.cycles)
         return {"success": True}
     except Exception as e:
         polling_status["is_polling"] = False
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/stop-polling")
-async def stop_polling():
-    global polling_thread, polling_status
+def stop_polling():
+    global polling_status
     try:
         modbus_handler.stop_polling()
-        if polling_thread and polling_thread.is_alive():
-            polling_thread.join()
         polling_status["is_polling"] = False
         return {"success": True}
     except Exception as e:
@@ -1,16 +1,117 @@
 from typing import Dict, Optional
-from datetime import datetime
+from dataclasses import asdict
+from functools import lru_cache
+from operator import attrgetter
+import logging
+import queue
+import struct
 import threading
+import time
 from pathlib import Path
-from modbus_utils import generate_crc16_table, calculate_crc
+from modbus_utils import calculate_crc
 from modbus_logger import ModbusLogger
 from request_queue import RequestQueue, ModbusRequest
 from connection_manager import ConnectionManager, ModbusSettings
 
+logger = logging.getLogger(__name__)
+
+# The UI expects ISO timestamps, but full datetime construction per
+# response is costly; cache the formatted prefix for the current second
+# and only format the microseconds fresh
+_ts_second = 0
+_ts_prefix = ''
+
+def _isoformat_now() -> str:
+    global _ts_second, _ts_prefix
+    now = time.time()
+    second = int(now)
+    if second != _ts_second:
+        _ts_prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(second))
+        _ts_second = second
+    return f"{_ts_prefix}.{int((now - second) * 1_000_000):06d}"
+
+# Precompiled frame layouts; Struct.pack skips format-string parsing
+_READ_HEADER = struct.Struct('>BBHH')         # slave, function, address, count/value
+_WRITE_MULTI_HEADER = struct.Struct('>BBHHB') # slave, function, address, count, byte count
+_SHORT_HEADER = struct.Struct('>BBH')         # slave, function, address
+_REGISTER = struct.Struct('>H')
+_CRC = struct.Struct('<H')  # RTU sends the CRC low byte first
+
+# Function-code groups as frozensets: no per-call list allocation or scan
+_READ_BITS = frozenset((1, 2))
+_READ_REGS = frozenset((3, 4))
+_READ_FUNCS = frozenset((1, 2, 3, 4))
+_WRITE_SINGLE = frozenset((5, 6))
+_WRITE_ECHO = frozenset((5, 6, 15, 16))
+
+@lru_cache(maxsize=128)
+def _registers_struct(count: int) -> struct.Struct:
+    """Precompiled layout for a run of big-endian registers."""
+    return struct.Struct(f'>{count}H')
+
+# Register values repeat heavily across polling cycles, so the hex/binary
+# renderings are memoized per value; the cache tops out at 128K strings
+@lru_cache(maxsize=65536)
+def _format_value(value: int) -> tuple:
+    return f"0x{value:04X}", f"0b{value:016b}"
+
+# byte value -> its 8 coil booleans, LSB first; lets the coil parser expand
+# a whole response byte with one C-level list.extend instead of a bit loop
+_COIL_BITS = [tuple(bool(byte >> bit & 1) for bit in range(8)) for byte in range(256)]
+
+def _parse_coils(data) -> list:
+    """Payload of a read-coils/discrete-inputs response -> list of bools."""
+    byte_count = data[0]
+    coil_data = []
+
+    for byte_val in data[1:byte_count+1]:
+        coil_data.extend(_COIL_BITS[byte_val])
+
+    return coil_data
+
+def _parse_registers(data) -> list:
+    """Payload of a read-registers response -> list of ints."""
+    byte_count = data[0]
+    payload = data[1:1 + byte_count]
+    # Tolerate truncated frames by dropping a trailing odd byte
+    register_count = len(payload) // 2
+
+    # One C call unpacks the whole run of registers
+    return list(_registers_struct(register_count).unpack_from(payload))
+
+def _parse_write_echo(data) -> list:
+    """Payload of a write echo -> the written value/count."""
+    return [_REGISTER.unpack_from(data)[0]]
+
+# Standard Modbus exception codes, reported when a response echoes the
+# function code with its high bit set
+_EXCEPTION_CODES = {
+    1: "Illegal function",
+    2: "Illegal data address",
+    3: "Illegal data value",
+    4: "Slave device failure",
+    5: "Acknowledge",
+    6: "Slave device busy",
+    8: "Memory parity error",
+    10: "Gateway path unavailable",
+    11: "Gateway target device failed to respond",
+}
+
+# O(1) dispatch by function code; unknown codes fall through to the error
+_PARSERS = {
+    1: _parse_coils,
+    2: _parse_coils,
+    3: _parse_registers,
+    4: _parse_registers,
+    5: _parse_write_echo,
+    6: _parse_write_echo,
+    15: _parse_write_echo,
+    16: _parse_write_echo,
+}
+
 class ModbusHandler:
     def __init__(self):
         self._lock = threading.Lock()
-        self._crc16_table = generate_crc16_table()
         self._polling_thread = None
         self.logs_dir = Path("logs")
         self.logger = ModbusLogger(self.logs_dir)
@@ -20,6 +121,20 @@ class ModbusHandler:
         self._stop_polling = threading.Event()
         self._stop_timeout = threading.Event()
         self._started_requests = 0
+        # CSV writes happen on a background thread so a slow disk never
+        # stalls a transaction while the bus lock is held
+        self._log_queue = queue.SimpleQueue()
+        self._log_thread = threading.Thread(target=self._log_worker, daemon=True)
+        self._log_thread.start()
+
+    def _log_worker(self) -> None:
+        while True:
+            request, response_data, parsed_data = self._log_queue.get()
+            try:
+                self.logger.save_exchange_log(request, response_data)
+                self.logger.save_port_data(request, parsed_data)
+            except Exception as e:
+                logger.error(f"Error writing exchange log: {str(e)}")
 
     def get_available_ports(self) -> list[str]:
         return self.connection.get_available_ports()
@@ -33,164 +148,189 @@ class ModbusHandler:
             self.stop_polling()  # Always stop polling before disconnecting
             self.connection.disconnect()
 
-    def send_request(self, request: ModbusRequest) -> Dict:
+    def send_request(self, request: ModbusRequest, format_responses: bool = True) -> Dict:
+        if not self.connection.is_connected():
+            return {
+                "error": "Not connected",
+                "timestamp": _isoformat_now()
+            }
+
+        try:
+            data = self._prepare_request(request)
+            # Only the bus round-trip needs exclusivity; encoding and
+            # parsing can overlap with another caller's I/O
+            with self._lock:
+                response = self.connection.send_and_receive(
+                    data, self._expected_response_length(request.function, request.count))
+            return self._build_result(request, data, response, format_responses)
+
+        except Exception as e:
+            request.stats.errors += 1
+            request.stats.remaining = self.request_queue.get_remaining_count(request.name)
+            return {
+                "error": str(e),
+                "timestamp": _isoformat_now(),
+                "stats": asdict(request.stats)
+            }
+
+    def send_requests(self, requests: list[ModbusRequest],
+                      format_responses: bool = True) -> list[Dict]:
+        """Send a batch of requests in one pass over the connection."""
+        if not self.connection.is_connected():
+            return [{
+                "error": "Not connected",
+                "timestamp": _isoformat_now()
+            } for _ in requests]
+
+        frames = [self._prepare_request(request) for request in requests]
+        expected = [self._expected_response_length(request.function, request.count)
+                    for request in requests]
         with self._lock:
-            if not self.connection.is_connected():
-                return {
-                    "error": "Not connected",
-                    "timestamp": datetime.now().isoformat()
-                }
+            responses = self.connection.send_and_receive_batch(frames, expected)
+        return [
+            self._build_result(request, data, response, format_responses)
+            for request, data, response in zip(requests, frames, responses)
+        ]
+
+    def _build_result(self, request: ModbusRequest, data: bytes, response,
+                      format_responses: bool = True) -> Dict:
+        if not response:
+            request.stats.timeouts += 1
+            request.stats.remaining = self.request_queue.get_remaining_count(request.name)
+            return {
+                "error": "Timeout: No response received",
+                "request_hex": data.hex(),
+                "timestamp": _isoformat_now(),
+                "stats": asdict(request.stats)
+            }
+
+        try:
+            parsed_data = self._parse_response(response, request.function)
+            # The triple decimal/hex/binary formatting only matters to the
+            # /request UI; polling results are logged, not displayed
+            formatted_data = self._format_response_data(parsed_data) if format_responses else None
+            request.stats.completed += 1
+            request.stats.remaining = self.request_queue.get_remaining_count(request.name)
+
+            response_data = {
+                "request_hex": data.hex(),
+                "response_hex": response.hex(),
+                "parsed_data": parsed_data,
+                "formatted_data": formatted_data,
+                "timestamp": _isoformat_now(),
+                "stats": asdict(request.stats)
+            }
+
+            self._log_queue.put((request, response_data, parsed_data))
+
+            return response_data
+
+        except Exception as e:
+            request.stats.errors += 1
+            request.stats.remaining = self.request_queue.get_remaining_count(request.name)
+            return {
+                "error": f"Parse error: {str(e)}",
+                "request_hex": data.hex(),
+                "response_hex": response.hex(),
+                "timestamp": _isoformat_now(),
+                "stats": asdict(request.stats)
+            }
+
+    @staticmethod
+    def _expected_response_length(function: int, count: int) -> int:
+        """Length of a well-formed RTU response: slave + function + payload + CRC."""
+        if function in _READ_BITS:  # Read coils/discrete inputs
+            return 5 + (count + 7) // 8
+        if function in _READ_REGS:  # Read holding/input registers
+            return 5 + 2 * count
+        if function in _WRITE_ECHO:  # Write echoes are fixed-size
+            return 8
+        return 256  # Unknown function: fall back to reading until timeout
+
+    def _prepare_request(self, request: ModbusRequest) -> bytes:
+        # Steady-state polling re-sends identical frames every cycle, so
+        # encoding (including the CRC) is cached on the wire-relevant fields
+        return self._encode_frame(
+            request.slave_id,
+            request.function,
+            request.start_address,
+            request.count,
+            tuple(request.data) if request.data is not None else None
+        )
+
+    @lru_cache(maxsize=256)
+    def _encode_frame(self, slave_id: int, function: int, start_address: int,
+                      count: int, values: Optional[tuple]) -> bytes:
+        if function in _READ_FUNCS:  # Read functions
+            data = bytearray(_READ_HEADER.pack(slave_id, function, start_address, count))
+        elif function in _WRITE_SINGLE:  # Single write functions
+            value = values[0] if values else 0
+            data = bytearray(_READ_HEADER.pack(slave_id, function, start_address, value))
+        elif function == 15:  # Write multiple coils
+            byte_count = (count + 7) // 8
+            data = bytearray(_WRITE_MULTI_HEADER.pack(slave_id, function, start_address, count, byte_count))
+
+            # Accumulate the coil bits into one int and let to_bytes emit
+            # every payload byte in a single C call (LSB-first, per spec)
+            packed = 0
+            for i, value in enumerate(values or ()):
+                if value:
+                    packed |= 1 << i
+            data += packed.to_bytes(byte_count, 'little')
+        elif function == 16:  # Write multiple registers
+            data = bytearray(_WRITE_MULTI_HEADER.pack(slave_id, function, start_address, count, count * 2))
+
+            if values:
+                # One C call packs the whole register run, mirroring the
+                # bulk unpack on the parse side
+                data += _registers_struct(len(values)).pack(*values)
+        else:
+            data = bytearray(_SHORT_HEADER.pack(slave_id, function, start_address))
 
-            try:
-                data = self._prepare_request(request)
-                response = self.connection.send_and_receive(data)
-                
-                if not response:
-                    request.stats.timeouts += 1
-                    request.stats.remaining = self.request_queue.get_remaining_count(request.name)
-                    return {
-                        "error": "Timeout: No response received",
-                        "request_hex": data.hex(),
-                        "timestamp": datetime.now().isoformat(),
-                        "stats": request.stats.__dict__
-                    }
-
-                try:
-                    parsed_data = self._parse_response(bytes(response), request.function)
-                    formatted_data = self._format_response_data(parsed_data)
-                    request.stats.completed += 1
-                    request.stats.remaining = self.request_queue.get_remaining_count(request.name)
-                    
-                    response_data = {
-                        "request_hex": data.hex(),
-                        "response_hex": response.hex(),
-                        "parsed_data": parsed_data,
-                        "formatted_data": formatted_data,
-                        "timestamp": datetime.now().isoformat(),
-                        "stats": request.stats.__dict__
-                    }
-                    
-                    self.logger.save_exchange_log(request, response_data)
-                    self.logger.save_port_data(request, parsed_data)
-                    
-                    return response_data
-                    
-                except Exception as e:
-                    request.stats.errors += 1
-                    request.stats.remaining = self.request_queue.get_remaining_count(request.name)
-                    return {
-                        "error": f"Parse error: {str(e)}",
-                        "request_hex": data.hex(),
-                        "response_hex": response.hex(),
-                        "timestamp": datetime.now().isoformat(),
-                        "stats": request.stats.__dict__
-                    }
-                
-            except Exception as e:
-                request.stats.errors += 1
-                request.stats.remaining = self.request_queue.get_remaining_count(request.name)
-                return {
-                    "error": str(e),
-                    "timestamp": datetime.now().isoformat(),
-                    "stats": request.stats.__dict__
-                }
-
-    def _prepare_request(self, request: ModbusRequest) -> bytearray:
-        data = bytearray([request.slave_id, request.function])
-        
-        # Add address (2 bytes)
-        data.extend([(request.start_address >> 8) & 0xFF, request.start_address & 0xFF])
-        
-        if request.function in [1, 2, 3, 4]:  # Read functions
-            # Add quantity (2 bytes)
-            data.extend([(request.count >> 8) & 0xFF, request.count & 0xFF])
-        elif request.function in [5, 6]:  # Single write functions
-            # Add single value (2 bytes)
-            value = request.data[0] if request.data else 0
-            data.extend([(value >> 8) & 0xFF, value & 0xFF])
-        elif request.function in [15, 16]:  # Multiple write functions
-            # Add quantity (2 bytes)
-            data.extend([(request.count >> 8) & 0xFF, request.count & 0xFF])
-            
-            if request.function == 15:  # Write multiple coils
-                byte_count = (request.count + 7) // 8
-                data.append(byte_count)
-                
-                values = 0
-                for i, value in enumerate(request.data or []):
-                    if value:
-                        values |= (1 << (i % 8))
-                    if (i + 1) % 8 == 0 or i == len(request.data or []) - 1:
-                        data.append(values)
-                        values = 0
-            else:  # Write multiple registers
-                byte_count = request.count * 2
-                data.append(byte_count)
-                
-                for value in request.data or []:
-                    data.extend([(value >> 8) & 0xFF, value & 0xFF])
-        
         # Calculate and append CRC
-        crc = calculate_crc(data, self._crc16_table)
-        data.extend([crc & 0xFF, (crc >> 8) & 0xFF])
-        
-        return data
+        data += _CRC.pack(calculate_crc(data))
+
+        return bytes(data)
 
     def _parse_response(self, response: bytes, function: int) -> list:
         if len(response) < 3:
             raise Exception("Response too short")
-            
-        # Skip slave ID and function code
-        data = response[2:]
-        
-        if function in [1, 2]:  # Read coils or discrete inputs
-            byte_count = data[0]
-            coil_data = []
-            
-            for byte_val in data[1:byte_count+1]:
-                for bit in range(8):
-                    coil_data.append(bool(byte_val & (1 << bit)))
-                    
-            return coil_data
-            
-        elif function in [3, 4]:  # Read holding or input registers
-            byte_count = data[0]
-            register_data = []
-            
-            for i in range(1, byte_count, 2):
-                if i + 1 < len(data):
-                    register_data.append((data[i] << 8) | data[i + 1])
-                    
-            return register_data
-            
-        elif function in [5, 6, 15, 16]:  # Write functions
-            # For write functions, return the written values
-            return [(data[0] << 8) | data[1]]
-            
-        else:
+
+        if response[1] & 0x80:
+            # Exception frame: high bit of the echoed function code is set
+            # and the payload is a one-byte exception code; reject before
+            # the data parsers misread it as values
+            code = response[2]
+            raise Exception(
+                f"Modbus exception: {_EXCEPTION_CODES.get(code, 'Unknown exception')} (code {code})")
+
+        parser = _PARSERS.get(function)
+        if parser is None:
             raise Exception(f"Unsupported function code: {function}")
 
+        # Skip slave ID and function code
+        return parser(response[2:])
+
     def _format_response_data(self, parsed_data: list) -> Dict:
-        formatted = {
-            "decimal": [],
-            "hex": [],
-            "binary": []
-        }
-        
+        decimal = []
+        hex_values = []
+        binary = []
+
         for value in parsed_data:
             if isinstance(value, bool):
-                formatted["decimal"].append(1 if value else 0)
-                formatted["hex"].append("0x01" if value else "0x00")
-                formatted["binary"].append("0b1" if value else "0b0")
+                decimal.append(1 if value else 0)
+                hex_values.append("0x01" if value else "0x00")
+                binary.append("0b1" if value else "0b0")
             else:
-                formatted["decimal"].append(value)
-                formatted["hex"].append(f"0x{value:04X}")
-                formatted["binary"].append(f"0b{value:016b}")
-                
-        return formatted
+                decimal.append(value)
+                hex_value, binary_value = _format_value(value)
+                hex_values.append(hex_value)
+                binary.append(binary_value)
+
+        return {"decimal": decimal, "hex": hex_values, "binary": binary}
 
     def start_polling(self, requests: list[ModbusRequest], interval: float, cycles: Optional[int] = None) -> None:
-        print(f"Starting polling with interval {interval}s and {cycles if cycles is not None else 'infinite'} cycles")
+        logger.info(f"Starting polling with interval {interval}s and {cycles if cycles is not None else 'infinite'} cycles")
         
         with self._lock:
             # Stop any existing polling
@@ -202,8 +342,9 @@ class ModbusHandler:
             self._stop_polling.clear()
             self._started_requests = 0
             
-            # Add requests to queue
-            for request in requests:
+            # Add requests to queue in their configured order; sorting once
+            # here keeps the polling loop itself sort-free
+            for request in sorted(requests, key=attrgetter('order')):
                 self.request_queue.add_request(request, cycles)
             
             self._polling_thread = threading.Thread(target=self._polling_worker, args=(interval,))
@@ -220,37 +361,52 @@ class ModbusHandler:
                 if interval > 0:
                     self._stop_polling.wait(interval)
                 continue
-            
+
+            # Requests without an inter-request delay can share one batched
+            # pass over the connection instead of paying per-request locking
+            batch = [request]
+            while batch[-1].delay_after == 0 and len(batch) < 16:
+                next_request = self.request_queue.get_next_request()
+                if not next_request:
+                    break
+                batch.append(next_request)
+
+            batch_start = time.monotonic()
             try:
-                self._started_requests += 1
-                print(f"Executing request {request.name}")
-                response = self.send_request(request)
-                print(f"Poll response for {request.name}: {response}")
-                
-                if 'error' in response:
-                    consecutive_errors += 1
-                    if consecutive_errors >= max_consecutive_errors:
-                        print(f"Stopping polling due to {max_consecutive_errors} consecutive errors")
-                        self.stop_polling()
-                        break
+                self._started_requests += len(batch)
+                logger.debug(f"Executing requests: {[r.name for r in batch]}")
+                if len(batch) == 1:
+                    responses = [self.send_request(batch[0], format_responses=False)]
                 else:
-                    consecutive_errors = 0  # Reset error counter on successful request
-                
-                # For infinite polling, add the request back to the queue
-                if request.stats.total == 0:
-                    self.request_queue.add_request(request)
-                
-                if not self._stop_polling.is_set() and request.delay_after > 0:
-                    # Use stop_timeout event for delay
+                    responses = self.send_requests(batch, format_responses=False)
+
+                for request, response in zip(batch, responses):
+                    logger.debug(f"Poll response for {request.name}: {response}")
+
+                    if 'error' in response:
+                        consecutive_errors += 1
+                    else:
+                        consecutive_errors = 0  # Reset error counter on successful request
+
+                if consecutive_errors >= max_consecutive_errors:
+                    logger.warning(f"Stopping polling due to {max_consecutive_errors} consecutive errors")
+                    self.stop_polling()
+                    break
+
+                if not self._stop_polling.is_set() and batch[-1].delay_after > 0:
+                    # Wait against a monotonic deadline so the cadence does
+                    # not drift by however long the bus round-trip took
                     self._stop_timeout.clear()
-                    self._stop_timeout.wait(request.delay_after / 1_000_000)  # Convert microseconds to seconds
-                    
+                    remaining = batch[-1].delay_after / 1_000_000 - (time.monotonic() - batch_start)
+                    if remaining > 0:
+                        self._stop_timeout.wait(remaining)
+
             except Exception as e:
-                print(f"Error during polling for {request.name}: {str(e)}")
+                logger.error(f"Error during polling for {request.name}: {str(e)}")
                 request.stats.errors += 1
                 consecutive_errors += 1
                 if consecutive_errors >= max_consecutive_errors:
-                    print(f"Stopping polling due to {max_consecutive_errors} consecutive errors")
+                    logger.warning(f"Stopping polling due to {max_consecutive_errors} consecutive errors")
                     self.stop_polling()
                     break
                 continue
@@ -261,20 +417,24 @@ class ModbusHandler:
                 self._stop_timeout.wait(interval)
 
     def stop_polling(self) -> None:
-        print("Stopping polling...")
+        logger.info("Stopping polling...")
         self._stop_polling.set()
         self._stop_timeout.set()  # Also stop any current timeout
         self._is_polling = False
         if self._polling_thread and self._polling_thread.is_alive():
             self._polling_thread.join(timeout=1.0)
+            if self._polling_thread.is_alive():
+                # Do not block the caller indefinitely; the daemon worker
+                # will exit on its own once the current I/O call returns
+                logger.warning("Polling worker did not stop within 1s; continuing shutdown")
         self.request_queue.clear()
         self._started_requests = 0
-        print("Polling stopped")
+        logger.info("Polling stopped")
 
     def stop_current_timeout(self) -> None:
         """Stop waiting for the current timeout."""
         self._stop_timeout.set()
-        print("Timeout wait stopped")
+        logger.debug("Timeout wait stopped")
 
     def get_stats(self) -> Dict:
         """Get current polling statistics."""
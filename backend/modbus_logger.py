@@ -1,3 +1,4 @@
+import atexit
 import csv
 from datetime import datetime
 from pathlib import Path
@@ -7,34 +8,67 @@ class ModbusLogger:
     def __init__(self, logs_dir: Path):
         self.logs_dir = logs_dir
         self.logs_dir.mkdir(exist_ok=True)
+        # Long-lived buffered writers keyed by filename; reopening the
+        # file per row costs an open/close syscall pair per request
+        self._files = {}
+        self._writers = {}
+        # One stamp for the whole session: embedding the current second in
+        # the filename produced a fresh file (and cold writer) every second
+        self._session_stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        atexit.register(self.close)
 
-    def save_exchange_log(self, request, response_data: Dict):
-        """Save request/response exchange data to CSV."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = self.logs_dir / f"exchange_log_{timestamp}.csv"
-        
-        with open(filename, 'a', newline='') as f:
+    def _get_writer(self, filename: Path, header: List[str]):
+        """Return a cached csv.writer for filename, opening it on first use."""
+        writer = self._writers.get(filename)
+        if writer is None:
+            f = open(filename, 'a', buffering=1 << 16, newline='')
             writer = csv.writer(f)
             if f.tell() == 0:  # Write header if file is empty
-                writer.writerow(['Timestamp', 'Request Name', 'Request HEX', 'Response HEX', 'Parsed Data'])
-            
-            writer.writerow([
-                datetime.now().isoformat(),
-                request.name,
-                response_data.get('request_hex', ''),
-                response_data.get('response_hex', ''),
-                str(response_data.get('parsed_data', []))
-            ])
+                writer.writerow(header)
+            self._files[filename] = f
+            self._writers[filename] = writer
+        return writer
+
+    def flush(self):
+        """Push buffered rows to disk."""
+        for f in self._files.values():
+            try:
+                f.flush()
+            except Exception:
+                pass
+
+    def close(self):
+        """Flush and close all open log files."""
+        for f in self._files.values():
+            try:
+                f.flush()
+                f.close()
+            except Exception:
+                pass
+        self._files.clear()
+        self._writers.clear()
+
+    def save_exchange_log(self, request, response_data: Dict):
+        """Save request/response exchange data to CSV."""
+        filename = self.logs_dir / f"exchange_log_{self._session_stamp}.csv"
+
+        writer = self._get_writer(
+            filename,
+            ['Timestamp', 'Request Name', 'Request HEX', 'Response HEX', 'Parsed Data'])
+        writer.writerow([
+            datetime.now().isoformat(),
+            request.name,
+            response_data.get('request_hex', ''),
+            response_data.get('response_hex', ''),
+            str(response_data.get('parsed_data', []))
+        ])
 
     def save_port_data(self, request, parsed_data: List[Union[int, bool]]):
         """Save parsed port data to CSV."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = self.logs_dir / f"port_data_{request.name}_{timestamp}.csv"
-        
-        with open(filename, 'a', newline='') as f:
-            writer = csv.writer(f)
-            if f.tell() == 0:  # Write header if file is empty
-                writer.writerow(['Timestamp', 'Value'])
-            
-            for value in parsed_data:
-                writer.writerow([datetime.now().isoformat(), value])
\ No newline at end of file
+        filename = self.logs_dir / f"port_data_{request.name}_{self._session_stamp}.csv"
+
+        # All values in a response share one timestamp; formatting it per
+        # value and writing row-by-row just multiplied the overhead
+        timestamp = datetime.now().isoformat()
+        writer = self._get_writer(filename, ['Timestamp', 'Value'])
+        writer.writerows((timestamp, value) for value in parsed_data)
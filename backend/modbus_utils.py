@@ -1,3 +1,10 @@
+try:
+    # crcmod's predefined 'modbus' function runs the byte loop in C
+    from crcmod.predefined import mkPredefinedCrcFun
+    _crc16_c = mkPredefinedCrcFun('modbus')
+except ImportError:
+    _crc16_c = None
+
 def generate_crc16_table():
     """Generate a CRC-16 lookup table."""
     table = []
@@ -13,9 +20,28 @@ def generate_crc16_table():
         table.append(crc)
     return table
 
-def calculate_crc(data: bytes, table) -> int:
-    """Calculate CRC-16 for given data using pre-generated table."""
+# Shared immutable table, computed once at import; every handler reuses it
+# and a tuple indexes slightly faster than a list
+CRC16_TABLE = tuple(generate_crc16_table())
+
+# Slicing-by-4 side tables: the pure-Python fallback consumes four bytes
+# per loop iteration instead of one (Sarwate), so interpreter overhead
+# drops ~4x when crcmod is not installed
+_T0 = CRC16_TABLE
+_T1 = tuple((_T0[i] >> 8) ^ _T0[_T0[i] & 0xFF] for i in range(256))
+_T2 = tuple((_T1[i] >> 8) ^ _T0[_T1[i] & 0xFF] for i in range(256))
+_T3 = tuple((_T2[i] >> 8) ^ _T0[_T2[i] & 0xFF] for i in range(256))
+
+def calculate_crc(data: bytes) -> int:
+    """Calculate CRC-16 for given data using pre-generated tables."""
+    if _crc16_c is not None:
+        return _crc16_c(data)
+
     crc = 0xFFFF
-    for byte in data:
-        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    aligned = len(data) & ~3
+    for i in range(0, aligned, 4):
+        low = crc ^ data[i] ^ (data[i + 1] << 8)
+        crc = _T3[low & 0xFF] ^ _T2[low >> 8] ^ _T1[data[i + 2]] ^ _T0[data[i + 3]]
+    for byte in data[aligned:]:
+        crc = (crc >> 8) ^ _T0[(crc ^ byte) & 0xFF]
     return crc
\ No newline at end of file
@@ -1,9 +1,10 @@
-from dataclasses import dataclass
+from collections import Counter, deque
+from dataclasses import dataclass, field
 from typing import List, Optional
 import threading
 import time
 
-@dataclass
+@dataclass(slots=True)
 class RequestStats:
     total: int = 0
     completed: int = 0
@@ -23,36 +24,63 @@ class ModbusRequest:
     order: int = 0
     delay_after: float = 100000  # microseconds (100ms default)
     cycles: Optional[int] = None
-    stats: RequestStats = RequestStats()
+    stats: RequestStats = field(default_factory=RequestStats)
 
 class RequestQueue:
+    """Schedules requests as (request, remaining-cycles) entries.
+
+    One entry per request regardless of cycle count, so a plan of
+    thousands of cycles costs O(requests) memory, not O(requests*cycles).
+    A remaining count of -1 means poll forever; those entries rotate to
+    the back of the queue after each dispatch.
+    """
+
     def __init__(self):
-        self._queue = []
+        self._queue = deque()
+        # Pending cycles per request name, kept in step with _queue so
+        # get_remaining_count is a dict lookup instead of a queue scan
+        self._counts = Counter()
         self._lock = threading.Lock()
         self._stop_polling = threading.Event()
-        
+
     def add_request(self, request: ModbusRequest, cycles: Optional[int] = None):
         with self._lock:
             request_cycles = request.cycles if request.cycles is not None else cycles
             if request_cycles is not None and request_cycles > 0:
                 request.stats.total = request_cycles
                 request.stats.remaining = request_cycles
-                self._queue.extend([request] * request_cycles)
+                self._queue.append([request, request_cycles])
+                self._counts[request.name] += request_cycles
             else:
-                # For infinite polling, add just one instance
                 request.stats.total = 0  # 0 indicates infinite
                 request.stats.remaining = 0
-                self._queue.append(request)
+                self._queue.append([request, -1])
+                self._counts[request.name] += 1
 
     def get_next_request(self) -> Optional[ModbusRequest]:
         with self._lock:
-            if self._queue:
-                return self._queue.pop(0)
-            return None
+            if not self._queue:
+                return None
+            entry = self._queue[0]
+            request, remaining = entry
+            if remaining == -1:
+                # Infinite requests take turns: move to the back so other
+                # requests keep getting serviced
+                self._queue.rotate(-1)
+            elif remaining > 1:
+                # Finite requests run their cycles back to back, matching
+                # the old expanded-copies ordering
+                entry[1] = remaining - 1
+                self._counts[request.name] -= 1
+            else:
+                self._queue.popleft()
+                self._counts[request.name] -= 1
+            return request
 
     def clear(self):
         with self._lock:
             self._queue.clear()
+            self._counts.clear()
 
     def stop(self):
         self._stop_polling.set()
@@ -66,4 +94,4 @@ class RequestQueue:
 
     def get_remaining_count(self, request_name: str) -> int:
         with self._lock:
-            return len([r for r in self._queue if r.name == request_name])
+            return self._counts[request_name]